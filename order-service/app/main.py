@@ -1,10 +1,16 @@
 import os
+import sys
 import uvicorn
 import httpx
 import asyncio
-from fastapi import FastAPI, HTTPException
+import time
+import orjson
+from array import array
+from collections import defaultdict
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 import socket
 import platform
@@ -15,17 +21,22 @@ from shared.logger import ServiceLogger
 from shared.middleware import LoggingMiddleware
 from shared.telemetry import OpenTelemetryService
 
+# 프로세스 수명 동안 변하지 않는 호스트/플랫폼 정보 (한 번만 조회)
+_HOST = socket.gethostname()
+_OS = platform.platform()
+_PYVER = platform.python_version()
+
 # 서비스 로거 인스턴스 생성
 logger = ServiceLogger(
     service_name="order-service", 
     log_level="INFO",
-    hostname=socket.gethostname()
+    hostname=_HOST
 )
 
 # OpenTelemetry 서비스 인스턴스 생성
 telemetry = OpenTelemetryService("order-service")
 
-app = FastAPI(title="Order Service API")
+app = FastAPI(title="Order Service API", default_response_class=ORJSONResponse)
 
 # OpenTelemetry로 앱 계측
 telemetry.instrument_app(app)
@@ -46,11 +57,102 @@ app.add_middleware(
 USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8001")
 RESTAURANT_SERVICE_URL = os.getenv("RESTAURANT_SERVICE_URL", "http://restaurant-service:8002")
 
+# 업스트림 서비스 호출용 공유 HTTP 클라이언트 (keep-alive 커넥션 풀 재사용, HTTP/2 협상 시 스트림 다중화)
+_http = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(5.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30)
+)
+
+# 업스트림 조회 결과 TTL 캐시 (진행 중인 조회를 공유해 동시 중복 호출 방지)
+UPSTREAM_CACHE_TTL = 5.0
+_upstream_cache = {}
+_upstream_inflight = {}
+
+class OrderStore:
+    """
+    주문 데이터를 컬럼별 배열(SoA)로 보관하는 인메모리 저장소
+
+    정수 컬럼은 int64 배열에 연속으로 저장하고, 응답용 dict는 조회된 행에 대해서만 만듭니다.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.user_ids = array("q")
+        self.restaurant_ids = array("q")
+        self.statuses = []
+        self.items = []
+        self._row_by_id = {}
+        self._rows_by_user = defaultdict(list)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, order_id, user_id, restaurant_id, items, status):
+        """주문을 추가하고 응답용 dict를 반환합니다."""
+        row = len(self.ids)
+        self.ids.append(order_id)
+        self.user_ids.append(user_id)
+        self.restaurant_ids.append(restaurant_id)
+        self.items.append(items)
+        self.statuses.append(status)
+        self._row_by_id[order_id] = row
+        self._rows_by_user[user_id].append(row)
+        return self._materialize(row)
+
+    def get(self, order_id):
+        """주문 ID로 주문을 조회합니다. 없으면 None을 반환합니다."""
+        row = self._row_by_id.get(order_id)
+        return None if row is None else self._materialize(row)
+
+    def by_user(self, user_id):
+        """사용자 ID에 해당하는 주문 목록을 반환합니다."""
+        return [self._materialize(row) for row in self._rows_by_user.get(user_id, ())]
+
+    def all(self):
+        """전체 주문 목록을 반환합니다."""
+        return [self._materialize(row) for row in range(len(self.ids))]
+
+    def next_id(self):
+        """다음에 발급할 주문 ID"""
+        return max(self.ids, default=0) + 1
+
+    def _materialize(self, row):
+        return {
+            "id": self.ids[row],
+            "user_id": self.user_ids[row],
+            "restaurant_id": self.restaurant_ids[row],
+            "items": self.items[row],
+            "status": self.statuses[row],
+        }
+
+# 업스트림 호출 실패 시 스택 트레이스 기록 여부 (기본 비활성화)
+DEBUG_TRACEBACKS = os.getenv("DEBUG_TRACEBACKS") == "1"
+
+# 스팬 속성 키 (요청마다 재사용)
+_K_USER_ID = sys.intern("user.id")
+_K_USER_FOUND = sys.intern("user.found")
+_K_USER_NAME = sys.intern("user.name")
+_K_REST_ID = sys.intern("restaurant.id")
+_K_REST_FOUND = sys.intern("restaurant.found")
+_K_REST_NAME = sys.intern("restaurant.name")
+_K_REST_CUISINE = sys.intern("restaurant.cuisine")
+_K_ORDER_ID = sys.intern("order.id")
+_K_ORDER_FOUND = sys.intern("order.found")
+_K_ORDER_USER_ID = sys.intern("order.user_id")
+_K_ORDER_REST_ID = sys.intern("order.restaurant_id")
+_K_ORDER_STATUS = sys.intern("order.status")
+
 # 예시 주문 데이터
-orders = [
-    {"id": 1, "user_id": 1, "restaurant_id": 2, "items": ["California Roll", "Miso Soup"], "status": "completed"},
-    {"id": 2, "user_id": 2, "restaurant_id": 1, "items": ["Margherita Pizza", "Tiramisu"], "status": "in-progress"}
-]
+orders = OrderStore()
+orders.add(1, 1, 2, ["California Roll", "Miso Soup"], "completed")
+orders.add(2, 2, 1, ["Margherita Pizza", "Tiramisu"], "in-progress")
+
+# 다음에 발급할 주문 ID
+_next_order_id = orders.next_id()
+
+# 전체 주문 목록 직렬화 결과 캐시 (주문 생성 시 무효화)
+_orders_json_cache = None
 
 # 주문 모델 정의
 class OrderItem(BaseModel):
@@ -59,6 +161,8 @@ class OrderItem(BaseModel):
     price: Optional[float] = None
 
 class OrderCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     user_id: int
     restaurant_id: int
     items: List[OrderItem]
@@ -70,9 +174,9 @@ async def startup_event():
     trace_id = telemetry.get_trace_id() or "없음"
     logger.event(
         "service_started", 
-        host=socket.gethostname(),
-        os=platform.platform(),
-        python_version=platform.python_version(),
+        host=_HOST,
+        os=_OS,
+        python_version=_PYVER,
         workers=os.environ.get("WORKERS", "1"),
         environment=os.environ.get("ENVIRONMENT", "development"),
         user_service_url=USER_SERVICE_URL,
@@ -84,6 +188,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """서비스 종료 시 실행되는 이벤트 핸들러"""
+    await _http.aclose()
     logger.event("service_stopped")
     logger.info("주문 서비스가 종료되었습니다.")
 
@@ -94,105 +199,148 @@ async def health_check():
         logger.debug("헬스 체크 요청을 받았습니다.")
         return {"status": "healthy"}
 
-async def get_user(user_id: int, trace_id: str = None):
+async def _fetch_and_cache(key, fetch):
+    """업스트림을 호출하고 결과를 TTL 캐시에 반영합니다. (요청과 분리된 태스크에서 실행)"""
+    try:
+        value = await fetch()
+        if value is None:
+            # 조회 실패(비정상 응답) 시 캐시 무효화
+            _upstream_cache.pop(key, None)
+        else:
+            _upstream_cache[key] = (time.monotonic() + UPSTREAM_CACHE_TTL, value)
+        return value
+    finally:
+        _upstream_inflight.pop(key, None)
+
+async def _cached_lookup(key, fetch):
+    """
+    TTL 캐시를 확인하고, 없으면 키별로 한 번만 업스트림을 호출합니다.
+
+    업스트림 호출은 요청과 분리된 태스크에서 실행되므로, 먼저 조회를 시작한 요청이
+    취소(클라이언트 연결 종료 등)되어도 함께 기다리던 요청은 결과를 그대로 받습니다.
+    중복 제거된 요청의 업스트림 호출은 먼저 시작한 요청의 추적 컨텍스트와 전파 헤더를
+    사용하므로, 해당 호출 스팬은 그 요청의 트레이스에만 기록됩니다.
+    """
+    while True:
+        cached = _upstream_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        # 같은 키의 조회가 진행 중이면 그 결과를 함께 기다림 (실패 결과도 공유)
+        task = _upstream_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(_fetch_and_cache(key, fetch))
+            _upstream_inflight[key] = task
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 공유 중인 조회 태스크 자체가 취소된 경우에만 다시 조회, 이 요청이 취소된 경우는 전파
+            if task.cancelled():
+                continue
+            raise
+
+def _build_propagation_headers(trace_id: str = None) -> dict:
+    """업스트림 호출에 공통으로 사용할 추적 전파 헤더를 요청당 한 번 생성합니다."""
+    headers = {}
+    telemetry.inject_span_context(headers)
+    
+    if trace_id:
+        headers["X-Trace-ID"] = trace_id
+    if logger.request_id:
+        headers["X-Request-ID"] = logger.request_id
+    return headers
+
+async def get_user(user_id: int, headers: dict):
+    """사용자 정보를 TTL 캐시를 거쳐 가져옵니다."""
+    return await _cached_lookup(("user", user_id), lambda: _fetch_user(user_id, headers))
+
+async def get_restaurant(restaurant_id: int, headers: dict):
+    """레스토랑 정보를 TTL 캐시를 거쳐 가져옵니다."""
+    return await _cached_lookup(("restaurant", restaurant_id), lambda: _fetch_restaurant(restaurant_id, headers))
+
+async def _fetch_user(user_id: int, headers: dict):
     """사용자 서비스에서 사용자 정보를 가져옵니다."""
     # 새 스팬 생성
     with telemetry.create_span("get_user_from_service", kind=trace.SpanKind.CLIENT) as span:
-        span.set_attribute("user.id", user_id)
-        
-        logger.info(f"사용자 서비스 호출 시작: 사용자 ID {user_id}", external_call="user-service")
+        span.set_attribute(_K_USER_ID, user_id)
         
-        # 헤더에 컨텍스트 전파
-        headers = {}
-        telemetry.inject_span_context(headers)
-        
-        if trace_id:
-            headers["X-Trace-ID"] = trace_id
-        if logger.request_id:
-            headers["X-Request-ID"] = logger.request_id
+        logger.info("사용자 서비스 호출 시작: 사용자 ID %s", user_id, external_call="user-service")
         
         try:
-            with logger.timer("external_call_user_service") as timer:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(f"{USER_SERVICE_URL}/users/{user_id}", headers=headers)
-                    
-                    if response.status_code != 200:
-                        span.set_status(trace.StatusCode.ERROR, f"사용자 서비스 호출 실패: {response.status_code}")
-                        logger.warning(
-                            f"사용자 서비스 호출 실패: {response.status_code}",
-                            status_code=response.status_code,
-                            user_id=user_id
-                        )
-                        return None
-                    
-                    user_data = response.json().get("user")
-                    span.set_attribute("user.found", user_data is not None)
-                    
-                    if user_data:
-                        span.set_attribute("user.name", user_data.get("name", ""))
-                    
-                    logger.info(f"사용자 서비스 호출 성공: 사용자 ID {user_id}", 
-                              response_time_ms=timer.elapsed_ms)
-                    return user_data
+            t0 = time.perf_counter()
+            response = await _http.get(f"{USER_SERVICE_URL}/users/{user_id}", headers=headers)
+            
+            if response.status_code != 200:
+                span.set_status(trace.StatusCode.ERROR, f"사용자 서비스 호출 실패: {response.status_code}")
+                logger.warning(
+                    f"사용자 서비스 호출 실패: {response.status_code}",
+                    status_code=response.status_code,
+                    user_id=user_id
+                )
+                return None
+            
+            user_data = orjson.loads(response.content).get("user")
+            span.set_attribute(_K_USER_FOUND, user_data is not None)
+            
+            if user_data and span.is_recording():
+                span.set_attribute(_K_USER_NAME, user_data.get("name", ""))
+            
+            logger.info("사용자 서비스 호출 성공: 사용자 ID %s", user_id,
+                      response_time_ms=(time.perf_counter() - t0) * 1000)
+            return user_data
         except Exception as e:
             span.record_exception(e)
             span.set_status(trace.StatusCode.ERROR, str(e))
             
-            logger.error(f"사용자 서비스 호출 중 오류 발생: {str(e)}", 
+            logger.error("사용자 서비스 호출 중 오류 발생", 
+                        error_type=type(e).__name__,
+                        error=str(e),
                         user_id=user_id, 
                         service_url=USER_SERVICE_URL,
-                        exc_info=True)
+                        exc_info=DEBUG_TRACEBACKS)
             return None
 
-async def get_restaurant(restaurant_id: int, trace_id: str = None):
+async def _fetch_restaurant(restaurant_id: int, headers: dict):
     """레스토랑 서비스에서 레스토랑 정보를 가져옵니다."""
     # 새 스팬 생성
     with telemetry.create_span("get_restaurant_from_service", kind=trace.SpanKind.CLIENT) as span:
-        span.set_attribute("restaurant.id", restaurant_id)
+        span.set_attribute(_K_REST_ID, restaurant_id)
         
-        logger.info(f"레스토랑 서비스 호출 시작: 레스토랑 ID {restaurant_id}", external_call="restaurant-service")
-        
-        # 헤더에 컨텍스트 전파
-        headers = {}
-        telemetry.inject_span_context(headers)
-        
-        if trace_id:
-            headers["X-Trace-ID"] = trace_id
-        if logger.request_id:
-            headers["X-Request-ID"] = logger.request_id
+        logger.info("레스토랑 서비스 호출 시작: 레스토랑 ID %s", restaurant_id, external_call="restaurant-service")
         
         try:
-            with logger.timer("external_call_restaurant_service") as timer:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(f"{RESTAURANT_SERVICE_URL}/restaurants/{restaurant_id}", headers=headers)
-                    
-                    if response.status_code != 200:
-                        span.set_status(trace.StatusCode.ERROR, f"레스토랑 서비스 호출 실패: {response.status_code}")
-                        logger.warning(
-                            f"레스토랑 서비스 호출 실패: {response.status_code}",
-                            status_code=response.status_code,
-                            restaurant_id=restaurant_id
-                        )
-                        return None
-                    
-                    restaurant_data = response.json().get("restaurant")
-                    span.set_attribute("restaurant.found", restaurant_data is not None)
-                    
-                    if restaurant_data:
-                        span.set_attribute("restaurant.name", restaurant_data.get("name", ""))
-                        span.set_attribute("restaurant.cuisine", restaurant_data.get("cuisine", ""))
-                    
-                    logger.info(f"레스토랑 서비스 호출 성공: 레스토랑 ID {restaurant_id}", 
-                              response_time_ms=timer.elapsed_ms)
-                    return restaurant_data
+            t0 = time.perf_counter()
+            response = await _http.get(f"{RESTAURANT_SERVICE_URL}/restaurants/{restaurant_id}", headers=headers)
+            
+            if response.status_code != 200:
+                span.set_status(trace.StatusCode.ERROR, f"레스토랑 서비스 호출 실패: {response.status_code}")
+                logger.warning(
+                    f"레스토랑 서비스 호출 실패: {response.status_code}",
+                    status_code=response.status_code,
+                    restaurant_id=restaurant_id
+                )
+                return None
+            
+            restaurant_data = orjson.loads(response.content).get("restaurant")
+            span.set_attribute(_K_REST_FOUND, restaurant_data is not None)
+            
+            if restaurant_data and span.is_recording():
+                span.set_attribute(_K_REST_NAME, restaurant_data.get("name", ""))
+                span.set_attribute(_K_REST_CUISINE, restaurant_data.get("cuisine", ""))
+            
+            logger.info("레스토랑 서비스 호출 성공: 레스토랑 ID %s", restaurant_id,
+                      response_time_ms=(time.perf_counter() - t0) * 1000)
+            return restaurant_data
         except Exception as e:
             span.record_exception(e)
             span.set_status(trace.StatusCode.ERROR, str(e))
             
-            logger.error(f"레스토랑 서비스 호출 중 오류 발생: {str(e)}", 
+            logger.error("레스토랑 서비스 호출 중 오류 발생", 
+                        error_type=type(e).__name__,
+                        error=str(e),
                         restaurant_id=restaurant_id, 
                         service_url=RESTAURANT_SERVICE_URL,
-                        exc_info=True)
+                        exc_info=DEBUG_TRACEBACKS)
             return None
 
 @app.get("/orders")
@@ -204,63 +352,68 @@ async def get_orders(user_id: int = None):
     with telemetry.create_span("get_orders") as span:
         if user_id:
             span.set_attribute("filter.user_id", user_id)
-            logger.info(f"사용자 ID {user_id}의 주문 목록 조회", user_id=user_id)
-            filtered_orders = [o for o in orders if o["user_id"] == user_id]
+            logger.info("사용자 ID %s의 주문 목록 조회", user_id, user_id=user_id)
+            filtered_orders = orders.by_user(user_id)
             span.set_attribute("orders.filtered_count", len(filtered_orders))
             return {"orders": filtered_orders}
         
         span.set_attribute("orders.count", len(orders))
-        logger.info(f"전체 주문 목록 조회: {len(orders)}개의 주문 반환")
-        return {"orders": orders}
+        logger.info("전체 주문 목록 조회: %s개의 주문 반환", len(orders))
+        
+        global _orders_json_cache
+        if _orders_json_cache is None:
+            _orders_json_cache = orjson.dumps({"orders": orders.all()})
+        return Response(content=_orders_json_cache, media_type="application/json")
 
 @app.get("/orders/{order_id}")
 async def get_order(order_id: int):
     """특정 주문 정보 조회 엔드포인트"""
     with telemetry.create_span("get_order_by_id") as span:
-        span.set_attribute("order.id", order_id)
+        span.set_attribute(_K_ORDER_ID, order_id)
         
-        logger.debug(f"주문 ID {order_id}에 대한 조회 요청", order_id=order_id)
+        logger.debug("주문 ID %s에 대한 조회 요청", order_id, order_id=order_id)
         
         try:
-            with logger.timer("get_order_by_id_operation") as timer:
-                # 주문 ID로 주문 찾기
-                order = next((o for o in orders if o["id"] == order_id), None)
-                
-                if not order:
-                    span.set_attribute("order.found", False)
-                    span.set_status(trace.StatusCode.ERROR, f"주문 ID {order_id}를 찾을 수 없습니다.")
-                    
-                    logger.warning(f"주문 ID {order_id}를 찾을 수 없습니다.", order_id=order_id)
-                    raise HTTPException(status_code=404, detail="Order not found")
-                
-                span.set_attribute("order.found", True)
-                span.set_attribute("order.user_id", order["user_id"])
-                span.set_attribute("order.restaurant_id", order["restaurant_id"])
-                span.set_attribute("order.status", order["status"])
-                
-                # 추적 ID 가져오기
-                trace_id = telemetry.get_trace_id()
-                
-                # 사용자 및 레스토랑 정보 병렬 요청
-                user_task = asyncio.create_task(get_user(order["user_id"], trace_id))
-                restaurant_task = asyncio.create_task(get_restaurant(order["restaurant_id"], trace_id))
-                
-                user, restaurant = await asyncio.gather(user_task, restaurant_task)
-                
-                # 응답 준비
-                response = {
-                    "order": order,
-                    "user": user,
-                    "restaurant": restaurant
-                }
-                
-                logger.info(f"주문 ID {order_id} 조회 성공", 
-                           order_id=order_id, 
-                           user_id=order["user_id"],
-                           restaurant_id=order["restaurant_id"],
-                           processing_time_ms=timer.elapsed_ms)
+            t0 = time.perf_counter()
+            # 주문 ID로 주문 찾기
+            order = orders.get(order_id)
+            
+            if not order:
+                span.set_attribute(_K_ORDER_FOUND, False)
+                span.set_status(trace.StatusCode.ERROR, f"주문 ID {order_id}를 찾을 수 없습니다.")
                 
-                return response
+                logger.warning(f"주문 ID {order_id}를 찾을 수 없습니다.", order_id=order_id)
+                raise HTTPException(status_code=404, detail="Order not found")
+            
+            span.set_attribute(_K_ORDER_FOUND, True)
+            span.set_attribute(_K_ORDER_USER_ID, order["user_id"])
+            span.set_attribute(_K_ORDER_REST_ID, order["restaurant_id"])
+            span.set_attribute(_K_ORDER_STATUS, order["status"])
+            
+            # 추적 ID 가져오기
+            trace_id = telemetry.get_trace_id()
+            headers = _build_propagation_headers(trace_id)
+            
+            # 사용자 및 레스토랑 정보 병렬 요청
+            user, restaurant = await asyncio.gather(
+                get_user(order["user_id"], headers),
+                get_restaurant(order["restaurant_id"], headers)
+            )
+            
+            # 응답 준비
+            response = {
+                "order": order,
+                "user": user,
+                "restaurant": restaurant
+            }
+            
+            logger.info("주문 ID %s 조회 성공", order_id,
+                       order_id=order_id, 
+                       user_id=order["user_id"],
+                       restaurant_id=order["restaurant_id"],
+                       processing_time_ms=(time.perf_counter() - t0) * 1000)
+            
+            return response
         except HTTPException as e:
             # HTTP 예외 로깅 및 전파
             span.record_exception(e)
@@ -281,67 +434,69 @@ async def get_order(order_id: int):
 async def create_order(order_data: OrderCreate):
     """새 주문 생성 엔드포인트"""
     with telemetry.create_span("create_order") as span:
-        span.set_attribute("order.user_id", order_data.user_id)
-        span.set_attribute("order.restaurant_id", order_data.restaurant_id)
+        span.set_attribute(_K_ORDER_USER_ID, order_data.user_id)
+        span.set_attribute(_K_ORDER_REST_ID, order_data.restaurant_id)
         span.set_attribute("order.items_count", len(order_data.items))
         
         logger.info("새 주문 생성 요청", user_id=order_data.user_id, restaurant_id=order_data.restaurant_id)
         
         try:
-            with logger.timer("create_order_operation") as timer:
-                # 현재 추적 ID 가져오기
-                trace_id = telemetry.get_trace_id()
-                
-                # 사용자 및 레스토랑 정보 병렬 요청으로 검증
-                user_task = asyncio.create_task(get_user(order_data.user_id, trace_id))
-                restaurant_task = asyncio.create_task(get_restaurant(order_data.restaurant_id, trace_id))
-                
-                user, restaurant = await asyncio.gather(user_task, restaurant_task)
-                
-                # 사용자나 레스토랑이 존재하지 않으면 오류 반환
-                if not user:
-                    span.set_attribute("validation.error", "user_not_found")
-                    span.set_status(trace.StatusCode.ERROR, f"사용자 ID {order_data.user_id}가 존재하지 않습니다.")
-                    
-                    logger.warning(f"주문 생성 실패: 사용자 ID {order_data.user_id}가 존재하지 않습니다.", 
-                                 user_id=order_data.user_id)
-                    raise HTTPException(status_code=404, detail="User not found")
-                
-                if not restaurant:
-                    span.set_attribute("validation.error", "restaurant_not_found")
-                    span.set_status(trace.StatusCode.ERROR, f"레스토랑 ID {order_data.restaurant_id}가 존재하지 않습니다.")
-                    
-                    logger.warning(f"주문 생성 실패: 레스토랑 ID {order_data.restaurant_id}가 존재하지 않습니다.", 
-                                 restaurant_id=order_data.restaurant_id)
-                    raise HTTPException(status_code=404, detail="Restaurant not found")
-                
-                # 새 주문 ID는 현재 주문 목록 중 가장 높은 ID + 1
-                new_order_id = max(o["id"] for o in orders) + 1 if orders else 1
-                
-                # 새 주문 생성
-                new_order = {
-                    "id": new_order_id,
-                    "user_id": order_data.user_id,
-                    "restaurant_id": order_data.restaurant_id,
-                    "items": [{"name": item.name, "quantity": item.quantity, "price": item.price} for item in order_data.items],
-                    "status": "pending"
-                }
-                
-                # 주문 목록에 추가
-                orders.append(new_order)
-                
-                span.set_attribute("order.id", new_order_id)
-                span.set_attribute("order.status", "pending")
+            t0 = time.perf_counter()
+            # 현재 추적 ID 가져오기
+            trace_id = telemetry.get_trace_id()
+            headers = _build_propagation_headers(trace_id)
+            
+            # 사용자 및 레스토랑 정보 병렬 요청으로 검증
+            user, restaurant = await asyncio.gather(
+                get_user(order_data.user_id, headers),
+                get_restaurant(order_data.restaurant_id, headers)
+            )
+            
+            # 사용자나 레스토랑이 존재하지 않으면 오류 반환
+            if not user:
+                span.set_attribute("validation.error", "user_not_found")
+                span.set_status(trace.StatusCode.ERROR, f"사용자 ID {order_data.user_id}가 존재하지 않습니다.")
                 
-                logger.info(f"주문 생성 성공: ID {new_order_id}", 
-                           order_id=new_order_id,
-                           user_id=order_data.user_id,
-                           restaurant_id=order_data.restaurant_id,
-                           items_count=len(order_data.items),
-                           processing_time_ms=timer.elapsed_ms)
+                logger.warning(f"주문 생성 실패: 사용자 ID {order_data.user_id}가 존재하지 않습니다.", 
+                             user_id=order_data.user_id)
+                raise HTTPException(status_code=404, detail="User not found")
+            
+            if not restaurant:
+                span.set_attribute("validation.error", "restaurant_not_found")
+                span.set_status(trace.StatusCode.ERROR, f"레스토랑 ID {order_data.restaurant_id}가 존재하지 않습니다.")
                 
-                # 주문 정보 반환
-                return {"order": new_order}
+                logger.warning(f"주문 생성 실패: 레스토랑 ID {order_data.restaurant_id}가 존재하지 않습니다.", 
+                             restaurant_id=order_data.restaurant_id)
+                raise HTTPException(status_code=404, detail="Restaurant not found")
+            
+            # 새 주문 ID 발급
+            global _next_order_id, _orders_json_cache
+            new_order_id = _next_order_id
+            _next_order_id += 1
+            
+            # 새 주문 생성 및 저장소에 추가 (검증된 모델을 한 번에 dict로 변환)
+            dumped = order_data.model_dump()
+            new_order = orders.add(
+                new_order_id,
+                dumped["user_id"],
+                dumped["restaurant_id"],
+                dumped["items"],
+                "pending"
+            )
+            _orders_json_cache = None
+            
+            span.set_attribute(_K_ORDER_ID, new_order_id)
+            span.set_attribute(_K_ORDER_STATUS, "pending")
+            
+            logger.info("주문 생성 성공: ID %s", new_order_id,
+                       order_id=new_order_id,
+                       user_id=order_data.user_id,
+                       restaurant_id=order_data.restaurant_id,
+                       items_count=len(order_data.items),
+                       processing_time_ms=(time.perf_counter() - t0) * 1000)
+            
+            # 주문 정보 반환
+            return {"order": new_order}
         except HTTPException as e:
             # HTTP 예외 로깅 및 전파
             span.record_exception(e)
@@ -364,4 +519,14 @@ async def create_order(order_data: OrderCreate):
             raise HTTPException(status_code=500, detail="Internal server error")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8003, reload=True) 
\ No newline at end of file
+    # 주문 저장소, 주문 ID 카운터, 주문 목록 캐시는 워커별 메모리에 있으므로 기본 워커 수는 1
+    # (WORKERS로 늘리면 워커마다 주문 ID가 겹치고 조회 결과가 달라짐)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8003,
+        reload=os.environ.get("RELOAD") == "1",
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WORKERS", "1"))
+    ) 
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""initial order schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ORDER_STATUS = sa.Enum(
+    "PENDING", "CONFIRMED", "PREPARING", "OUT_FOR_DELIVERY", "DELIVERED", "CANCELLED", "FAILED",
+    name="orderstatus",
+)
+
+
+def upgrade():
+    # 이전 버전에서 create_all로 생성된 테이블이 있으면 건너뛰고 누락된 인덱스만 추가
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "orders" not in existing_tables:
+        op.create_table(
+            "orders",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer()),
+            sa.Column("total_price", sa.Float()),
+            sa.Column("status", ORDER_STATUS),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.Column("address", sa.String()),
+            sa.Column("phone", sa.String()),
+            sa.Column("payment_status", sa.String()),
+        )
+
+    if "order_items" not in existing_tables:
+        op.create_table(
+            "order_items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id")),
+            sa.Column("menu_id", sa.Integer()),
+            sa.Column("quantity", sa.Integer()),
+            sa.Column("price", sa.Float()),
+            sa.Column("name", sa.String()),
+        )
+
+    op.create_index("ix_orders_id", "orders", ["id"], if_not_exists=True)
+    op.create_index("ix_orders_user_id", "orders", ["user_id"], if_not_exists=True)
+    op.create_index(
+        "ix_orders_user_created", "orders", ["user_id", sa.text("created_at DESC")], if_not_exists=True
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"], if_not_exists=True)
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table("order_items")
+    op.drop_table("orders")
+    ORDER_STATUS.drop(op.get_bind(), checkfirst=True)
@@ -1,28 +1,58 @@
 import os
+import atexit
+import queue
 import logging
-import json
-from datetime import datetime
+import time
+import orjson
 import traceback
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import uuid
 
+# 로그 파일 기본 디렉토리
+BASE_LOG_DIR = "/var/log/microservices"
+
+# 핸들러 설정을 마친 서비스 이름 (같은 이름으로 다시 생성해도 핸들러를 중복 추가하지 않음)
+_initialized = set()
+
+# 초 단위로 캐싱한 UTC 타임스탬프 접두어 (초가 바뀔 때만 다시 포맷팅)
+_timestamp_cache = (None, "")
+
+def _utc_timestamp():
+    """ISO 8601 형식의 현재 UTC 타임스탬프 (마이크로초 포함)"""
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_cache
+    if cached_second != second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}+00:00"
+
 class ServiceLogger:
     """
     마이크로서비스를 위한 로깅 유틸리티 클래스
     
     로그를 구조화된 JSON 형식으로 출력하고 
     파일과 콘솔에 동시에 로그를 기록합니다.
+    
+    호스트명처럼 프로세스 수명 동안 변하지 않는 값은 호출 측에서 모듈 수준에서
+    한 번만 계산해 전달하고, 로그 호출마다 다시 조회하지 않습니다.
     """
     
-    def __init__(self, service_name, log_level=logging.INFO):
+    def __init__(self, service_name, log_level=logging.INFO, hostname=None):
         self.service_name = service_name
+        self.hostname = hostname
         self.request_id = None
         
         # 로거 생성
         self.logger = logging.getLogger(service_name)
         self.logger.setLevel(log_level)
-        self.logger.handlers = []  # 기존 핸들러 제거
+        
+        # 이미 핸들러를 설정한 서비스면 기존 핸들러와 파일 리스너를 그대로 사용
+        if service_name in _initialized:
+            return
+        _initialized.add(service_name)
         
         # 형식 정의
         formatter = logging.Formatter('%(message)s')
@@ -30,11 +60,9 @@ class ServiceLogger:
         # 콘솔 핸들러
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
         
         # 로그 디렉토리 생성
-        base_log_dir = "/var/log/microservices"
-        service_log_dir = f"{base_log_dir}/{service_name}"
+        service_log_dir = f"{BASE_LOG_DIR}/{service_name}"
         os.makedirs(service_log_dir, exist_ok=True)
         
         # 파일 핸들러
@@ -44,7 +72,14 @@ class ServiceLogger:
             backupCount=5
         )
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        
+        # 요청 처리 스레드는 큐에 넣기만 하고, 콘솔/파일 쓰기는 모두 백그라운드 리스너 스레드가 수행
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(log_queue))
+        log_listener = QueueListener(log_queue, console_handler, file_handler)
+        log_listener.start()
+        # 프로세스 종료 시 큐에 남은 로그를 모두 기록
+        atexit.register(log_listener.stop)
     
     def set_request_id(self, request_id=None):
         """요청 ID 설정 (요청 추적용)"""
@@ -54,12 +89,16 @@ class ServiceLogger:
     def _format_log(self, level, message, **kwargs):
         """로그 메시지를 구조화된 JSON으로 포맷팅"""
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utc_timestamp(),
             "service": self.service_name,
             "level": level,
             "message": message
         }
         
+        # 호스트명이 있으면 추가
+        if self.hostname:
+            log_data["host"] = self.hostname
+        
         # 요청 ID가 있으면 추가
         if self.request_id:
             log_data["request_id"] = self.request_id
@@ -68,14 +107,23 @@ class ServiceLogger:
         for key, value in kwargs.items():
             log_data[key] = value
             
-        return json.dumps(log_data)
+        # datetime은 UTC로 직렬화하고, 직렬화할 수 없는 값은 문자열로 변환
+        return orjson.dumps(log_data, default=str, option=orjson.OPT_NAIVE_UTC).decode()
     
-    def info(self, message, **kwargs):
-        """정보 레벨 로그"""
+    def info(self, message, *args, **kwargs):
+        """정보 레벨 로그 (args가 있으면 레벨이 활성화된 경우에만 % 포맷팅)"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if args:
+            message = message % args
         self.logger.info(self._format_log("INFO", message, **kwargs))
     
-    def warning(self, message, **kwargs):
-        """경고 레벨 로그"""
+    def warning(self, message, *args, **kwargs):
+        """경고 레벨 로그 (args가 있으면 레벨이 활성화된 경우에만 % 포맷팅)"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
+        if args:
+            message = message % args
         self.logger.warning(self._format_log("WARNING", message, **kwargs))
     
     def error(self, message, exc_info=None, **kwargs):
@@ -93,8 +141,16 @@ class ServiceLogger:
         
         self.logger.error(self._format_log("ERROR", message, **{**error_info, **kwargs}))
     
-    def debug(self, message, **kwargs):
-        """디버그 레벨 로그"""
+    def event(self, event_name, **kwargs):
+        """서비스 수명주기 이벤트 로그 (정보 레벨)"""
+        self.info(event_name, event=event_name, **kwargs)
+    
+    def debug(self, message, *args, **kwargs):
+        """디버그 레벨 로그 (args가 있으면 레벨이 활성화된 경우에만 % 포맷팅)"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if args:
+            message = message % args
         self.logger.debug(self._format_log("DEBUG", message, **kwargs))
     
     def critical(self, message, exc_info=None, **kwargs):
@@ -1,67 +1,104 @@
+import itertools
+import logging
+import secrets
 import time
-import uuid
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .logger import ServiceLogger
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+# 로그에 남기지 않을 민감한 요청 헤더 (ASGI scope의 헤더 이름은 이미 소문자 bytes)
+_SENSITIVE_HEADERS = frozenset({b"authorization", b"cookie"})
+
+# 요청 ID 생성용 프로세스 접두어와 단조 증가 카운터 (상관관계 추적용 ID이므로 난수일 필요 없음)
+_PID_PREFIX = secrets.token_hex(4)
+_request_counter = itertools.count(1)
+
+
+class LoggingMiddleware:
     """
-    요청과 응답을 로깅하는 FastAPI 미들웨어
-    
+    요청과 응답을 로깅하는 순수 ASGI 미들웨어
+
     요청 시작/종료 시간, 응답 상태 코드, 처리 시간 등을 로깅합니다.
+    BaseHTTPMiddleware와 달리 요청마다 태스크 그룹이나 Request/Response 객체를 만들지 않습니다.
     """
-    
+
     def __init__(self, app: ASGIApp, logger: ServiceLogger):
-        super().__init__(app)
+        self.app = app
         self.logger = logger
-    
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 요청 ID 생성 (헤더에 있으면 사용, 없으면 새로 생성)
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request_id = None
+        for key, value in scope["headers"]:
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = f"{_PID_PREFIX}-{next(_request_counter):016x}"
         self.logger.set_request_id(request_id)
-        
+
         # 요청 정보 로깅
-        start_time = time.time()
-        self.logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            method=request.method,
-            path=request.url.path,
-            query_params=dict(request.query_params),
-            client_host=request.client.host if request.client else None,
-            headers={k: v for k, v in request.headers.items() if k.lower() not in ["authorization", "cookie"]}
-        )
-        
-        try:
-            # 요청 처리
-            response = await call_next(request)
-            
-            # 응답 정보와 처리 시간 로깅
-            process_time = time.time() - start_time
-            status_code = response.status_code
-            
-            log_method = self.logger.info if status_code < 400 else self.logger.warning
-            log_method(
-                f"Request completed: {request.method} {request.url.path} - {status_code}",
-                method=request.method,
-                path=request.url.path,
-                status_code=status_code,
-                process_time_ms=round(process_time * 1000, 2)
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        start_time = time.perf_counter()
+        # 헤더 디코딩은 INFO 로그가 활성화된 경우에만 수행
+        if self.logger.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Request started: %s %s", method, path,
+                method=method,
+                path=path,
+                query_string=scope.get("query_string", b"").decode("latin-1"),
+                client_host=client[0] if client else None,
+                headers={
+                    key.decode("latin-1"): value.decode("latin-1")
+                    for key, value in scope["headers"]
+                    if key not in _SENSITIVE_HEADERS
+                }
             )
-            
-            # 응답 헤더에 요청 ID 추가
-            response.headers["X-Request-ID"] = request_id
-            return response
-            
+
+        status_code = 500
+        # 응답 헤더에 추가할 요청 ID는 send_wrapper 밖에서 한 번만 인코딩
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                # 응답 헤더에 요청 ID 추가
+                status_code = message["status"]
+                headers = message.get("headers")
+                if isinstance(headers, list):
+                    # Starlette 응답은 헤더를 list로 전달하므로 복사 없이 그대로 추가
+                    headers.append(request_id_header)
+                else:
+                    message["headers"] = [*(headers or ()), request_id_header]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # 응답 정보와 처리 시간 로깅 (마지막 body 청크에서 한 번만)
+                process_time = time.perf_counter() - start_time
+                log_method = self.logger.info if status_code < 400 else self.logger.warning
+                log_method(
+                    "Request completed: %s %s - %s", method, path, status_code,
+                    method=method,
+                    path=path,
+                    status_code=status_code,
+                    process_time_ms=round(process_time * 1000, 2)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
             # 예외 발생 시 로깅
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             self.logger.error(
-                f"Request failed: {request.method} {request.url.path}",
+                f"Request failed: {method} {path}",
                 exc_info=exc,
-                method=request.method,
-                path=request.url.path,
+                method=method,
+                path=path,
                 process_time_ms=round(process_time * 1000, 2)
             )
-            raise 
\ No newline at end of file
+            raise
@@ -1,11 +1,15 @@
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
-from fastapi import Request, Response
+from fastapi import Response
 from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import time
 import psutil
 import os
 
 # Prometheus 메트릭 정의
+# endpoint 라벨에는 원본 URL 대신 라우트 템플릿(/users/{user_id})을 사용해 시계열 수를 라우트 수로 제한
+# status_code 라벨은 값의 종류가 수십 개 이내이므로 유지
 REQUEST_COUNT = Counter(
     'http_requests_total',
     'Total HTTP requests',
@@ -18,10 +22,10 @@ REQUEST_DURATION = Histogram(
     ['method', 'endpoint', 'service_name']
 )
 
+# 서비스마다 별도 프로세스라 service_name 라벨은 항상 같은 값이므로 라벨 없이 사용
 REQUEST_IN_PROGRESS = Gauge(
     'http_requests_in_progress',
-    'HTTP requests currently in progress',
-    ['service_name']
+    'HTTP requests currently in progress'
 )
 
 # 시스템 메트릭
@@ -57,34 +61,38 @@ REDIS_OPERATIONS = Counter(
     ['service_name', 'operation', 'status']
 )
 
+# 매칭되는 라우트가 없는 요청(404 등)의 endpoint 라벨
+UNMATCHED_ENDPOINT = "__unmatched__"
+
+# 시스템 메트릭 수집 주기 (초)
+SYSTEM_METRICS_INTERVAL = 5
+
 class PrometheusMiddleware:
     def __init__(self, app, service_name: str):
         self.app = app
         self.service_name = service_name
+        # 라벨이 바인딩된 메트릭 객체 캐시 (요청마다 .labels() 조회를 반복하지 않도록)
+        self._in_progress = REQUEST_IN_PROGRESS
+        self._counter_cache = {}
+        self._histogram_cache = {}
     
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
-        
         # 메트릭 엔드포인트는 메트릭 수집하지 않음
-        if request.url.path == "/metrics":
+        if scope["path"] == "/metrics":
             await self.app(scope, receive, send)
             return
         
-        method = request.method
-        path = request.url.path
+        method = scope["method"]
         
         # 진행 중인 요청 수 증가
-        REQUEST_IN_PROGRESS.labels(service_name=self.service_name).inc()
+        self._in_progress.inc()
         
         # 요청 시작 시간 기록
-        start_time = time.time()
-        
-        async def call_next(request):
-            return await self.app(scope, receive, send)
+        start_time = time.perf_counter()
         
         try:
             # 요청 처리를 위한 response 캡처
@@ -105,58 +113,106 @@ class PrometheusMiddleware:
             raise
         finally:
             # 요청 처리 시간 계산
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
+            
+            # 라우팅 후 scope에 채워지는 라우트의 경로 템플릿을 라벨로 사용
+            route = scope.get("route")
+            endpoint = route.path if route is not None else UNMATCHED_ENDPOINT
             
             # 메트릭 업데이트
-            REQUEST_COUNT.labels(
-                method=method,
-                endpoint=path,
-                status_code=status_code,
-                service_name=self.service_name
-            ).inc()
+            counter = self._counter_cache.get((method, endpoint, status_code))
+            if counter is None:
+                counter = self._counter_cache.setdefault(
+                    (method, endpoint, status_code),
+                    REQUEST_COUNT.labels(
+                        method=method,
+                        endpoint=endpoint,
+                        status_code=status_code,
+                        service_name=self.service_name
+                    )
+                )
+            counter.inc()
             
-            REQUEST_DURATION.labels(
-                method=method,
-                endpoint=path,
-                service_name=self.service_name
-            ).observe(duration)
+            histogram = self._histogram_cache.get((method, endpoint))
+            if histogram is None:
+                histogram = self._histogram_cache.setdefault(
+                    (method, endpoint),
+                    REQUEST_DURATION.labels(
+                        method=method,
+                        endpoint=endpoint,
+                        service_name=self.service_name
+                    )
+                )
+            histogram.observe(duration)
             
             # 진행 중인 요청 수 감소
-            REQUEST_IN_PROGRESS.labels(service_name=self.service_name).dec()
-            
-            # 시스템 메트릭 업데이트
-            self._update_system_metrics()
-    
-    def _update_system_metrics(self):
+            self._in_progress.dec()
+
+def create_prometheus_middleware(service_name: str):
+    """Prometheus 미들웨어 팩토리 함수"""
+    def prometheus_middleware(app):
+        return PrometheusMiddleware(app, service_name)
+    return prometheus_middleware
+
+def create_system_metrics_sampler(service_name: str):
+    """
+    시스템 메트릭(CPU/메모리) 수집 태스크의 (startup, shutdown) 훅 반환
+
+    요청 경로가 아닌 백그라운드 태스크에서 SYSTEM_METRICS_INTERVAL 주기로 수집하며,
+    shutdown 훅에서 태스크를 취소하고 종료될 때까지 기다립니다.
+    """
+    task = None
+
+    def update_system_metrics(process):
         """시스템 메트릭 업데이트"""
         try:
             # CPU 사용률
             cpu_percent = psutil.cpu_percent(interval=None)
-            CPU_USAGE.labels(service_name=self.service_name).set(cpu_percent)
+            CPU_USAGE.labels(service_name=service_name).set(cpu_percent)
             
-            # 메모리 사용률
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            memory_percent = process.memory_percent()
+            # 메모리 사용률 (oneshot으로 /proc 읽기를 한 번에 처리)
+            with process.oneshot():
+                memory_info = process.memory_info()
+                memory_percent = process.memory_percent()
             
-            MEMORY_USAGE.labels(service_name=self.service_name).set(memory_info.rss)
-            MEMORY_USAGE_PERCENT.labels(service_name=self.service_name).set(memory_percent)
+            MEMORY_USAGE.labels(service_name=service_name).set(memory_info.rss)
+            MEMORY_USAGE_PERCENT.labels(service_name=service_name).set(memory_percent)
             
         except Exception as e:
             # 시스템 메트릭 수집 실패 시 로그만 남기고 계속 진행
             print(f"Failed to collect system metrics: {e}")
 
-def create_prometheus_middleware(service_name: str):
-    """Prometheus 미들웨어 팩토리 함수"""
-    def prometheus_middleware(app):
-        return PrometheusMiddleware(app, service_name)
-    return prometheus_middleware
+    async def sampler_loop():
+        # Process 객체는 한 번만 생성해 재사용
+        process = psutil.Process(os.getpid())
+        while True:
+            update_system_metrics(process)
+            await asyncio.sleep(SYSTEM_METRICS_INTERVAL)
+
+    async def start():
+        nonlocal task
+        if task is None:
+            task = asyncio.create_task(sampler_loop())
+
+    async def stop():
+        nonlocal task
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        task = None
+
+    return start, stop
 
 def get_metrics_endpoint():
     """메트릭 엔드포인트 반환"""
     async def metrics():
+        # 레지스트리 전체를 문자열로 직렬화하는 작업은 스레드풀에서 수행해 이벤트 루프를 막지 않음
         return PlainTextResponse(
-            generate_latest(),
+            await run_in_threadpool(generate_latest),
             media_type=CONTENT_TYPE_LATEST
         )
     return metrics
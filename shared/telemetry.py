@@ -0,0 +1,82 @@
+import os
+from contextlib import contextmanager
+
+from opentelemetry import trace
+from opentelemetry.propagate import inject
+
+# OTLP 익스포터가 설정된 경우에만 트레이싱 활성화 (임포트 시 한 번만 계산)
+_otel_enabled = bool(os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"))
+
+
+class _NoopSpan:
+    """트레이싱 비활성화 시 사용하는 아무 동작도 하지 않는 스팬"""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def set_status(self, status, description=None):
+        pass
+
+    def record_exception(self, exception, attributes=None):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def is_recording(self):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class OpenTelemetryService:
+    """
+    마이크로서비스를 위한 OpenTelemetry 유틸리티 클래스
+
+    스팬 생성, 추적 컨텍스트 전파, FastAPI 계측을 담당합니다.
+    OTLP 익스포터가 설정되지 않은 경우 스팬 생성과 컨텍스트 전파를 건너뜁니다.
+    """
+
+    def __init__(self, service_name, enabled=None):
+        self.service_name = service_name
+        self.enabled = _otel_enabled if enabled is None else enabled
+        self.tracer = trace.get_tracer(service_name)
+
+    def instrument_app(self, app):
+        """FastAPI 앱 계측 (계측 패키지가 설치된 경우에만)"""
+        if not self.enabled:
+            return
+        try:
+            from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        except ImportError:
+            return
+        FastAPIInstrumentor.instrument_app(app)
+
+    @contextmanager
+    def create_span(self, name, kind=trace.SpanKind.INTERNAL, attributes=None):
+        """스팬 생성 (비활성화되었거나 샘플링에서 제외된 경우 no-op 스팬 반환)"""
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        with self.tracer.start_as_current_span(name, kind=kind, attributes=attributes) as span:
+            # 샘플링되지 않은 스팬은 컨텍스트 전파만 유지하고 속성 기록은 건너뜀
+            yield span if span.is_recording() else _NOOP_SPAN
+
+    def inject_span_context(self, headers):
+        """현재 추적 컨텍스트를 W3C traceparent 헤더로 주입"""
+        if self.enabled:
+            inject(headers)
+        return headers
+
+    def get_trace_id(self):
+        """현재 스팬의 trace_id (32자리 16진수) 반환"""
+        if not self.enabled:
+            return None
+        span_context = trace.get_current_span().get_span_context()
+        if not span_context.is_valid:
+            return None
+        return format(span_context.trace_id, "032x")
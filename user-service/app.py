@@ -1,20 +1,26 @@
-import time
+import asyncio
 import random
+import time
 import os
+import orjson
+from urllib.parse import parse_qs
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
-from fastapi import FastAPI, HTTPException, Depends, status, Request, Response
+from fastapi import FastAPI, HTTPException, Depends, status, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.openapi.docs import get_swagger_ui_html
+from fastapi.responses import ORJSONResponse
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
 from fastapi.openapi.utils import get_openapi
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean
+from sqlalchemy import create_engine, select, bindparam, lambda_stmt, Column, Integer, String, DateTime, Boolean
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-import redis
+import redis.asyncio as aioredis
+from redis.asyncio.connection import BlockingConnectionPool
 
 # 로깅 관련 모듈 임포트
 import sys
@@ -22,7 +28,7 @@ import logging
 try:
     from shared.logger import ServiceLogger
     from shared.middleware import LoggingMiddleware
-    from shared.prometheus_middleware import create_prometheus_middleware, get_metrics_endpoint
+    from shared.prometheus_middleware import create_prometheus_middleware, create_system_metrics_sampler, get_metrics_endpoint, increment_redis_operation
     LOGGING_ENABLED = True
     PROMETHEUS_ENABLED = True
 except ImportError:
@@ -36,14 +42,36 @@ JWT_SECRET = os.getenv("JWT_SECRET", "mysecretkey")
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+# bcrypt 비용 계수 (개발 환경에서는 낮춰서 로그인/가입 속도를 높일 수 있음)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 토큰 인증 시 사용하는 사용자 정보 캐시 TTL (초)
+# 사용자 비활성화/삭제 시 캐시를 지우는 경로가 없으므로 변경이 반영되기까지의 지연을 짧게 유지
+AUTH_USER_CACHE_TTL = 5
 
 # 데이터베이스 설정
-engine = create_engine(DB_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 동시 요청 수에 맞춰 풀 크기를 늘리고, DB 재시작 후 끊긴 커넥션은 사용 전에 감지
+engine = create_engine(
+    DB_URL,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800
+)
+# 커밋 후에도 객체 속성을 만료시키지 않아 응답 직렬화 시 추가 SELECT가 발생하지 않음
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
-# Redis 설정
-redis_client = redis.from_url(REDIS_URL)
+# Redis 설정 (상한이 있는 커넥션 풀을 재사용하고, 응답은 str로 디코딩)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+redis_pool = BlockingConnectionPool.from_url(
+    REDIS_URL,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    decode_responses=True,
+    socket_keepalive=True,
+    health_check_interval=30
+)
+redis_client = aioredis.Redis(connection_pool=redis_pool)
 
 # 인위적 지연 및 에러 설정을 위한 전역 변수
 global_delay_ms = 0
@@ -60,6 +88,14 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+# 사용자 조회 쿼리 (SQL 컴파일 결과를 프로세스 단위로 캐시해 재사용)
+USER_BY_USERNAME_STMT = lambda_stmt(
+    lambda: select(User).where(User.username == bindparam("username"))
+)
+TOKEN_USER_BY_USERNAME_STMT = lambda_stmt(
+    lambda: select(User.id, User.username, User.is_active).where(User.username == bindparam("username"))
+)
+
 # Pydantic 모델
 class UserBase(BaseModel):
     username: str = Field(..., description="사용자 아이디", example="user123")
@@ -83,6 +119,12 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = Field(None, description="사용자 아이디")
 
+class TokenUser(BaseModel):
+    """토큰 인증에 필요한 최소한의 사용자 정보 (Redis 캐시에 저장)"""
+    id: int
+    username: str
+    is_active: bool
+
 class ChaosDelayConfig(BaseModel):
     delay_ms: int = Field(..., description="지연 시간(밀리초)", example=1500)
 
@@ -90,7 +132,10 @@ class ChaosErrorConfig(BaseModel):
     enable: bool = Field(..., description="에러 발생 활성화 여부", example=True)
 
 # 패스워드 컨텍스트 및 OAuth2 설정
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+# 존재하지 않는 사용자 로그인 시에도 동일한 비용의 검증을 수행하기 위한 더미 해시
+# (워커마다 임포트 시 해시를 계산하지 않도록 기본 비용 12로 미리 생성한 값)
+DUMMY_PASSWORD_HASH = "$2b$12$3zspGLy5TMhOu4F3s5727OcpjGxcJn.fYndu2QBWgQO2Mu3t2TkWK"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 # 데이터베이스 초기화
@@ -121,8 +166,11 @@ app = FastAPI(
     3. 발급받은 토큰을 Authorization 헤더에 Bearer 형식으로 포함
     """,
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
+    # 문서/스키마 라우트는 미리 인코딩한 스키마를 반환하도록 파일 하단에서 직접 등록
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
+    default_response_class=ORJSONResponse
 )
 
 # CORS 미들웨어 추가
@@ -144,6 +192,16 @@ if PROMETHEUS_ENABLED:
     middleware_factory = create_prometheus_middleware("user-service")
     app.add_middleware(middleware_factory)
 
+    # 시스템 메트릭 수집 태스크는 앱 수명주기에 맞춰 시작/종료
+    start_system_metrics, stop_system_metrics = create_system_metrics_sampler("user-service")
+    app.add_event_handler("startup", start_system_metrics)
+    app.add_event_handler("shutdown", stop_system_metrics)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await redis_client.aclose()
+    await redis_pool.aclose()
+
 # 의존성 주입
 def get_db():
     db = SessionLocal()
@@ -152,28 +210,40 @@ def get_db():
     finally:
         db.close()
 
-# 미들웨어 추가
-@app.middleware("http")
-async def add_chaos_middleware(request: Request, call_next):
-    # 인위적 지연 적용
-    if global_delay_ms > 0:
-        time.sleep(global_delay_ms / 1000)
-    
-    # URL 파라미터 지연 적용
-    delay_param = request.query_params.get("delay")
-    if delay_param and delay_param.isdigit():
-        time.sleep(int(delay_param) / 1000)
-    
-    # 인위적 에러 발생
-    if chaos_error_enabled and random.random() < 0.5:
-        return Response(
-            status_code=500,
-            content="{'error': 'Chaos engineering induced error'}",
-            media_type="application/json"
-        )
-    
-    response = await call_next(request)
-    return response
+# 카오스 에러 응답 본문 (유효한 JSON으로 한 번만 인코딩)
+CHAOS_ERROR_BODY = orjson.dumps({"error": "Chaos engineering induced error"})
+
+# 카오스 미들웨어 (순수 ASGI, 이벤트 루프를 막지 않도록 asyncio.sleep 사용)
+class ChaosMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            # 인위적 지연 적용
+            if global_delay_ms > 0:
+                await asyncio.sleep(global_delay_ms / 1000)
+
+            # URL 파라미터 지연 적용 (delay 파라미터가 있을 때만 쿼리 문자열 파싱)
+            query_string = scope.get("query_string", b"")
+            if b"delay=" in query_string:
+                delay_param = parse_qs(query_string.decode("latin-1")).get("delay", [""])[0]
+                if delay_param.isdigit():
+                    await asyncio.sleep(int(delay_param) / 1000)
+
+            # 인위적 에러 발생
+            if chaos_error_enabled and random.random() < 0.5:
+                response = Response(
+                    status_code=500,
+                    content=CHAOS_ERROR_BODY,
+                    media_type="application/json"
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+app.add_middleware(ChaosMiddleware)
 
 # 유틸리티 함수
 def verify_password(plain_password, hashed_password):
@@ -183,18 +253,20 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+    user = db.execute(USER_BY_USERNAME_STMT, {"username": username}).scalar_one_or_none()
+    if not user:
+        # 사용자 존재 여부가 응답 시간으로 드러나지 않도록 더미 해시로 검증
+        verify_password(password, DUMMY_PASSWORD_HASH)
+        return None
+    if not verify_password(password, user.hashed_password):
         return None
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # exp는 epoch 초(정수)로 직접 계산해 datetime 변환 과정을 생략
+    expire_seconds = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode["exp"] = int(time.time()) + expire_seconds
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -212,10 +284,38 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
+
+    # 캐시된 사용자 정보가 있으면 DB 조회 생략
+    cache_key = f"u:{token_data.username}"
+    try:
+        cached_user = await redis_client.get(cache_key)
+        if cached_user:
+            if PROMETHEUS_ENABLED:
+                increment_redis_operation("user-service", "get", "hit")
+            return TokenUser(**orjson.loads(cached_user))
+        if PROMETHEUS_ENABLED:
+            increment_redis_operation("user-service", "get", "miss")
+    except Exception:
+        if PROMETHEUS_ENABLED:
+            increment_redis_operation("user-service", "get", "error")
+
+    # 인증에 필요한 컬럼만 조회 (ORM 객체 생성 없음)
+    row = db.execute(TOKEN_USER_BY_USERNAME_STMT, {"username": token_data.username}).first()
+    if row is None:
         raise credentials_exception
-    return user
+    token_user = TokenUser(**row._asdict())
+
+    try:
+        # 토큰의 남은 유효 시간보다 오래 캐시하지 않음
+        cache_ttl = min(AUTH_USER_CACHE_TTL, int(payload.get("exp", 0) - time.time()))
+        if cache_ttl > 0:
+            await redis_client.setex(cache_key, cache_ttl, orjson.dumps(token_user.model_dump()))
+            if PROMETHEUS_ENABLED:
+                increment_redis_operation("user-service", "set", "success")
+    except Exception:
+        if PROMETHEUS_ENABLED:
+            increment_redis_operation("user-service", "set", "error")
+    return token_user
 
 # 헬스체크 엔드포인트
 # Prometheus 메트릭 엔드포인트
@@ -229,9 +329,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
 async def metrics():
     try:
         if PROMETHEUS_ENABLED:
-            from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-            from fastapi.responses import PlainTextResponse
-            return PlainTextResponse(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+            metrics_func = get_metrics_endpoint()
+            return await metrics_func()
         else:
             return {"error": "Prometheus metrics not enabled"}
     except Exception as e:
@@ -285,23 +384,24 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     Returns:
         User: 생성된 사용자 정보 (비밀번호 제외)
     """
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
-    
-    db_email = db.query(User).filter(User.email == user.email).first()
-    if db_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
+    # 중복 검사는 사전 SELECT 대신 유니크 인덱스 위반으로 판단 (왕복 1회, 동시 가입 경쟁 조건 없음)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        constraint_name = getattr(getattr(e.orig, "diag", None), "constraint_name", None)
+        if constraint_name == "ix_users_username":
+            raise HTTPException(status_code=400, detail="Username already registered")
+        if constraint_name == "ix_users_email":
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise HTTPException(status_code=400, detail="Username or email already registered")
     return db_user
 
 # 로그인 엔드포인트
@@ -377,7 +477,7 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     Returns:
         User: 사용자 정보
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = db.get(User, user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -399,12 +499,12 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     """,
     response_description="유효한 사용자 정보"
 )
-def validate_user(current_user: User = Depends(get_current_user)):
+def validate_user(current_user: TokenUser = Depends(get_current_user)):
     """
     JWT 토큰을 통해 사용자 유효성을 검증합니다.
     
     Args:
-        current_user (User): 인증된 현재 사용자 (토큰에서 추출)
+        current_user (TokenUser): 인증된 현재 사용자 (토큰에서 추출)
         
     Returns:
         dict: 사용자 유효성 및 기본 정보
@@ -498,6 +598,14 @@ def set_chaos_error(config: ChaosErrorConfig):
     chaos_error_enabled = config.enable
     return {"message": f"Error injection set to: {config.enable}"}
 
+# 태그별 아이콘 표시 이름
+TAG_ICONS = {
+    "인증": "🔐 인증",
+    "사용자 관리": "👤 사용자 관리",
+    "카오스 엔지니어링": "⚡ 카오스 엔지니어링",
+    "상태 확인": "🔍 상태 확인",
+}
+
 # 커스텀 OpenAPI 스키마 생성 함수 추가
 def custom_openapi():
     if app.openapi_schema:
@@ -511,42 +619,58 @@ def custom_openapi():
     )
     
     # API 상세 정보 추가
-    for path in openapi_schema["paths"]:
-        for method in openapi_schema["paths"][path]:
-            if method in ["get", "post", "put", "delete"]:
-                operation = openapi_schema["paths"][path][method]
-                
-                # 설명과 요약 정보 개선
-                if "summary" in operation and operation["summary"]:
-                    # API 요약 정보를 강화하여 표시
-                    operation["summary"] = f"👉 {operation['summary']}"
-                
-                # 툴팁에 표시될 설명 정보 강화
-                if "description" in operation and operation["description"]:
-                    # 요약 설명을 설명 시작 부분에 굵게 추가
-                    first_line = operation["description"].split('\n')[0].strip()
-                    enhanced_desc = f"**{first_line}**\n\n{operation['description']}"
-                    operation["description"] = enhanced_desc
-                
-                # 태그에 아이콘 추가
-                if "tags" in operation and operation["tags"]:
-                    tags = operation["tags"]
-                    for i, tag in enumerate(tags):
-                        if tag == "인증":
-                            tags[i] = "🔐 인증"
-                        elif tag == "사용자 관리":
-                            tags[i] = "👤 사용자 관리"
-                        elif tag == "카오스 엔지니어링":
-                            tags[i] = "⚡ 카오스 엔지니어링"
-                        elif tag == "상태 확인":
-                            tags[i] = "🔍 상태 확인"
-                    operation["tags"] = tags
+    for path_item in openapi_schema["paths"].values():
+        for method, operation in path_item.items():
+            if method not in ("get", "post", "put", "delete"):
+                continue
+            
+            # API 요약 정보를 강화하여 표시
+            summary = operation.get("summary")
+            if summary:
+                operation["summary"] = f"👉 {summary}"
+            
+            # 툴팁에 표시될 설명 정보 강화 (요약 설명을 설명 시작 부분에 굵게 추가)
+            description = operation.get("description")
+            if description:
+                first_line = description.split('\n', 1)[0].strip()
+                operation["description"] = f"**{first_line}**\n\n{description}"
+            
+            # 태그에 아이콘 추가
+            tags = operation.get("tags")
+            if tags:
+                operation["tags"] = [TAG_ICONS.get(tag, tag) for tag in tags]
     
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
 app.openapi = custom_openapi
 
+# 워커 시작 시 스키마를 한 번 생성하고 JSON 바이트로 인코딩해 둠
+OPENAPI_JSON = orjson.dumps(app.openapi())
+
+OPENAPI_URL = "/openapi.json"
+SWAGGER_OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json():
+    return Response(content=OPENAPI_JSON, media_type="application/json")
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui_html():
+    return get_swagger_ui_html(
+        openapi_url=OPENAPI_URL,
+        title=f"{app.title} - Swagger UI",
+        oauth2_redirect_url=SWAGGER_OAUTH2_REDIRECT_URL
+    )
+
+@app.get(SWAGGER_OAUTH2_REDIRECT_URL, include_in_schema=False)
+async def swagger_ui_redirect():
+    return get_swagger_ui_oauth2_redirect_html()
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_html():
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
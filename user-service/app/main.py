@@ -1,38 +1,124 @@
 import os
+import time
+import random
+import hmac
+import base64
+import hashlib
 import uvicorn
+import orjson
+from array import array
 from fastapi import FastAPI, Depends, HTTPException, Form, status, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from anyio import to_thread
+from passlib.context import CryptContext
 from opentelemetry import trace
 from pydantic import BaseModel
 from typing import Optional
-import jwt
-from datetime import datetime, timedelta
-import hashlib
+from datetime import timedelta
 
 from shared.logger import ServiceLogger
 from shared.middleware import LoggingMiddleware
 from shared.telemetry import OpenTelemetryService
 import socket
 import platform
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from shared.prometheus_middleware import get_metrics_endpoint
 
 # JWT 설정
 JWT_SECRET = os.environ.get("JWT_SECRET", "mysecretkey")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
+JWT_EXPIRATION_SECONDS = JWT_EXPIRATION_HOURS * 3600
+JWT_SECRET_BYTES = JWT_SECRET.encode()
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+# HS256 토큰 헤더는 항상 같으므로 미리 인코딩
+JWT_HEADER_B64 = _b64url_encode(orjson.dumps({"alg": JWT_ALGORITHM, "typ": "JWT"}))
+
+def jwt_encode(payload: dict) -> str:
+    """HS256 JWT 인코딩 (HMAC은 hashlib/OpenSSL에서 계산)"""
+    signing_input = JWT_HEADER_B64 + b"." + _b64url_encode(orjson.dumps(payload))
+    signature = hmac.new(JWT_SECRET_BYTES, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url_encode(signature)).decode()
+
+def jwt_decode(token: str) -> dict:
+    """HS256 JWT 검증 및 디코딩 (서명/헤더/만료가 유효하지 않으면 ValueError)"""
+    try:
+        signing_input, signature_b64 = token.encode().rsplit(b".", 1)
+        header_b64, payload_b64 = signing_input.split(b".")
+    except ValueError:
+        raise ValueError("Malformed token")
+    # 이 서비스가 발급한 헤더(alg=HS256)만 허용해 알고리즘 혼동 공격 방지
+    if header_b64 != JWT_HEADER_B64:
+        raise ValueError("Unsupported token header")
+    expected = hmac.new(JWT_SECRET_BYTES, signing_input, hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, _b64url_decode(signature_b64)):
+        raise ValueError("Invalid signature")
+    payload = orjson.loads(_b64url_decode(payload_b64))
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        raise ValueError("Token expired")
+    return payload
+
+# 검증된 토큰 캐시: 토큰 -> (캐시 만료 epoch 초, 사용자 ID)
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX_SIZE = 10_000
+_token_cache = {}
+
+def decode_token_cached(token: str):
+    """검증된 토큰이면 서명 검증/JSON 디코딩 없이 캐시에서 사용자 ID 반환"""
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached and cached[0] > now:
+        return cached[1]
+    
+    payload = jwt_decode(token)
+    user_id = payload.get("sub")
+    if user_id is not None:
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            # 가장 먼저 추가된 항목부터 제거
+            _token_cache.pop(next(iter(_token_cache)))
+        # 토큰 자체의 만료 시각을 넘겨서 캐시하지 않음
+        _token_cache[token] = (min(now + TOKEN_CACHE_TTL, payload.get("exp", now + TOKEN_CACHE_TTL)), user_id)
+    return user_id
+
+# 비밀번호 해시 설정 (bcrypt 비용 계수는 환경변수로 조정)
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# 비밀번호 해시/검증을 수행하는 스레드풀 크기 (anyio 기본값 40)
+THREADPOOL_SIZE = int(os.environ.get("THREADPOOL_SIZE", "64"))
+
+# 프로세스 수명 동안 변하지 않는 호스트 정보 (임포트 시 한 번만 조회)
+_HOST = socket.gethostname()
+_OS = platform.platform()
+_PYVER = platform.python_version()
+
+# 헬스 체크 응답 본문 (고정값이므로 미리 인코딩)
+_HEALTH_BYTES = b'{"status":"healthy"}'
+# 헬스 체크 요청의 스팬 생성 여부 (프로브 요청이 많아 기본 비활성화)
+HEALTH_TRACE = os.environ.get("HEALTH_TRACE") == "1"
+# 사용자 단건 조회 중 스팬/소요 시간을 기록할 요청 비율 (헤드 기반 샘플링)
+USER_LOOKUP_SAMPLE_RATE = float(os.environ.get("USER_LOOKUP_SAMPLE_RATE", "0.01"))
 
 # 서비스 로거 인스턴스 생성
 logger = ServiceLogger(
     service_name="user-service", 
     log_level="INFO",
-    hostname=socket.gethostname()
+    hostname=_HOST
 )
 
 # OpenTelemetry 서비스 인스턴스 생성
 telemetry = OpenTelemetryService("user-service")
 
-app = FastAPI(title="User Service API")
+app = FastAPI(title="User Service API", default_response_class=ORJSONResponse)
 
 # OpenTelemetry로 앱 계측
 telemetry.instrument_app(app)
@@ -67,48 +153,112 @@ class Token(BaseModel):
 # 보안 스키마
 security = HTTPBearer()
 
+class UserStore:
+    """
+    사용자 데이터를 컬럼별 배열(SoA)로 보관하는 인메모리 저장소
+
+    ID는 int64 배열에 연속으로 저장하고, ID/사용자명/이메일별 행 인덱스로 O(1) 조회합니다.
+    응답용 dict는 조회된 행에 대해서만 만듭니다.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.usernames = []
+        self.emails = []
+        self.password_hashes = []
+        self._row_by_id = {}
+        self._row_by_username = {}
+        self._row_by_email = {}
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, username, email, password_hash):
+        """사용자를 추가하고 dict를 반환합니다. (await 없이 실행되므로 이벤트 루프 내에서 원자적)"""
+        user_id = self._next_id
+        self._next_id += 1
+        row = len(self.ids)
+        self.ids.append(user_id)
+        self.usernames.append(username)
+        self.emails.append(email)
+        self.password_hashes.append(password_hash)
+        self._row_by_id[user_id] = row
+        self._row_by_username[username] = row
+        self._row_by_email[email] = row
+        return self._materialize(row)
+
+    def get(self, user_id):
+        """사용자 ID로 사용자를 조회합니다. 없으면 None을 반환합니다."""
+        row = self._row_by_id.get(user_id)
+        return None if row is None else self._materialize(row)
+
+    def get_by_username(self, username):
+        """사용자명으로 사용자를 조회합니다. 없으면 None을 반환합니다."""
+        row = self._row_by_username.get(username)
+        return None if row is None else self._materialize(row)
+
+    def find_duplicate(self, username, email):
+        """중복된 사용자명/이메일이 있으면 오류 메시지를 반환합니다."""
+        if username in self._row_by_username:
+            return "Username already registered"
+        if email in self._row_by_email:
+            return "Email already registered"
+        return None
+
+    def all_public(self):
+        """password_hash를 제외한 전체 사용자 목록을 반환합니다."""
+        return [
+            {"id": user_id, "username": username, "email": email}
+            for user_id, username, email in zip(self.ids, self.usernames, self.emails)
+        ]
+
+    def _materialize(self, row):
+        return {
+            "id": self.ids[row],
+            "username": self.usernames[row],
+            "email": self.emails[row],
+            "password_hash": self.password_hashes[row],
+        }
+
 # 사용자 데이터베이스 (실제로는 데이터베이스를 사용해야 함)
-users_db = [
-    {
-        "id": 1, 
-        "username": "testuser", 
-        "email": "test@example.com",
-        "password_hash": hashlib.sha256("testpass".encode()).hexdigest()
-    }
-]
+users = UserStore()
+# 예시 사용자의 비밀번호("testpass") bcrypt 해시 (워커마다 임포트 시 해시를 계산하지 않도록 미리 생성)
+_SEED_TESTPASS_HASH = "$2b$12$buD2pD5KvaHMPWiSfExEZub0LHeW3W/Da7kRru2wflALwHOhcEnXS"
+users.add("testuser", "test@example.com", _SEED_TESTPASS_HASH)
+
+# 전체 사용자 목록 직렬화 결과 캐시 (사용자 추가 시 무효화)
+_users_json_cache = None
 
 def hash_password(password: str) -> str:
-    """비밀번호 해시화"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """비밀번호 해시화 (bcrypt)"""
+    return pwd_context.hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """비밀번호 검증"""
-    return hashlib.sha256(password.encode()).hexdigest() == password_hash
+    """비밀번호 검증 (상수 시간 비교)"""
+    return pwd_context.verify(password, password_hash)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """JWT 토큰 생성"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    # exp는 epoch 초(정수)로 직접 계산해 datetime 변환 과정을 생략
+    expire_seconds = int(expires_delta.total_seconds()) if expires_delta else JWT_EXPIRATION_SECONDS
+    to_encode["exp"] = int(time.time()) + expire_seconds
+    encoded_jwt = jwt_encode(to_encode)
     return encoded_jwt
 
 def get_user_by_username(username: str):
     """사용자명으로 사용자 찾기"""
-    return next((user for user in users_db if user["username"] == username), None)
+    return users.get_by_username(username)
 
 def get_user_by_id(user_id: int):
     """사용자 ID로 사용자 찾기"""
-    return next((user for user in users_db if user["id"] == user_id), None)
+    return users.get(user_id)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """현재 사용자 가져오기 (JWT 토큰 검증)"""
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: int = payload.get("sub")
+        user_id: int = decode_token_cached(credentials.credentials)
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -123,7 +273,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 headers={"WWW-Authenticate": "Bearer"},
             )
         return user
-    except jwt.PyJWTError:
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -133,13 +283,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 @app.on_event("startup")
 async def startup_event():
     """서비스 시작 시 실행되는 이벤트 핸들러"""
+    # 동시 로그인/가입이 몰려도 bcrypt 작업이 스레드풀 대기열에 쌓이지 않도록 크기 조정
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     # 로그에 trace_id 추가
     trace_id = telemetry.get_trace_id() or "없음"
     logger.event(
         "service_started", 
-        host=socket.gethostname(),
-        os=platform.platform(),
-        python_version=platform.python_version(),
+        host=_HOST,
+        os=_OS,
+        python_version=_PYVER,
         workers=os.environ.get("WORKERS", "1"),
         environment=os.environ.get("ENVIRONMENT", "development"),
         trace_id=trace_id
@@ -155,121 +307,112 @@ async def shutdown_event():
 @app.get("/health")
 async def health_check():
     """서비스 헬스 체크 엔드포인트"""
-    with telemetry.create_span("health_check"):
-        logger.debug("헬스 체크 요청을 받았습니다.")
-        return {"status": "healthy"}
+    if HEALTH_TRACE:
+        with telemetry.create_span("health_check"):
+            logger.debug("헬스 체크 요청을 받았습니다.")
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 @app.get("/users")
 async def get_users():
     """모든 사용자 조회 엔드포인트"""
     with telemetry.create_span("get_users_operation") as span:
         # 스팬에 속성 추가
-        span.set_attribute("users.count", len(users_db))
+        span.set_attribute("users.count", len(users))
+        
+        logger.info("사용자 목록 조회: %s명의 사용자가 있습니다.", len(users))
         
-        logger.info(f"사용자 목록 조회: {len(users_db)}명의 사용자가 있습니다.")
-        return {"users": users_db}
+        # 응답에서 password_hash 제외
+        global _users_json_cache
+        if _users_json_cache is None:
+            _users_json_cache = orjson.dumps({"users": users.all_public()})
+        return Response(content=_users_json_cache, media_type="application/json")
 
 @app.get("/users/{user_id}")
 async def get_user(user_id: int):
     """특정 사용자 조회 엔드포인트"""
-    with telemetry.create_span("get_user_by_id") as span:
-        # 스팬에 속성 추가
-        span.set_attribute("user.id", user_id)
-        
-        logger.debug(f"사용자 ID {user_id}에 대한 조회 요청")
-        
-        try:
-            # 타이머 컨텍스트 관리자를 사용하여 작업 시간 측정
-            with logger.timer("get_user_by_id_operation") as timer:
-                # 사용자 ID로 사용자 찾기
-                user = get_user_by_id(user_id)
-                
-                if user:
-                    span.set_attribute("user.found", True)
-                    span.set_attribute("user.name", user["username"])
-                    
-                    logger.info(f"사용자 ID {user_id} 조회 성공", user_data=user["username"])
-                    return {"user": user}
-                else:
-                    span.set_attribute("user.found", False)
-                    
-                    logger.warning(f"사용자 ID {user_id}를 찾을 수 없습니다.", user_id=user_id)
-                    span.set_status(trace.StatusCode.ERROR, f"사용자 ID {user_id}를 찾을 수 없습니다.")
-                    return {"error": "User not found"}, 404
-        except Exception as e:
-            # 예외 발생 시 스팬에 오류 정보 추가
-            span.record_exception(e)
-            span.set_status(trace.StatusCode.ERROR, str(e))
-            
-            logger.error(f"사용자 조회 중 오류 발생: {str(e)}", user_id=user_id, exc_info=True)
-            raise
-
-@app.post("/signup", response_model=UserResponse)
+    if random.random() < USER_LOOKUP_SAMPLE_RATE:
+        # 샘플링된 요청만 스팬과 조회 소요 시간을 기록
+        with telemetry.create_span("get_user_by_id") as span:
+            span.set_attribute("user.id", user_id)
+            t0 = time.perf_counter()
+            user = get_user_by_id(user_id)
+            span.set_attribute("user.found", user is not None)
+            if user:
+                span.set_attribute("user.name", user["username"])
+            else:
+                span.set_status(trace.StatusCode.ERROR, f"사용자 ID {user_id}를 찾을 수 없습니다.")
+            logger.debug("사용자 ID %s 조회 소요 시간: %.3fms", user_id, (time.perf_counter() - t0) * 1000)
+    else:
+        user = get_user_by_id(user_id)
+    
+    if user is None:
+        logger.warning("사용자 ID %s를 찾을 수 없습니다.", user_id, user_id=user_id)
+        return ORJSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "User not found"})
+    
+    logger.info("사용자 ID %s 조회 성공", user_id, user_data=user["username"])
+    # 응답에서 password_hash 제외
+    return {"user": {"id": user["id"], "username": user["username"], "email": user["email"]}}
+
+# 응답 모델은 문서화에만 사용하고, 반환 dict를 다시 검증하지 않음
+@app.post("/signup", responses={200: {"model": UserResponse}})
 async def signup(user_data: UserCreate):
     """회원가입 엔드포인트"""
     with telemetry.create_span("user_signup") as span:
         span.set_attribute("user.username", user_data.username)
         span.set_attribute("user.email", user_data.email)
         
-        logger.info(f"회원가입 요청: {user_data.username}")
+        logger.info("회원가입 요청: %s", user_data.username)
         
-        # 사용자명 중복 확인
-        if get_user_by_username(user_data.username):
-            logger.warning(f"중복된 사용자명: {user_data.username}")
+        # 사용자명/이메일 중복 확인
+        duplicate = users.find_duplicate(user_data.username, user_data.email)
+        if duplicate:
+            logger.warning("중복된 사용자 정보: %s (%s)", user_data.username, duplicate)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
+                detail=duplicate
             )
         
-        # 이메일 중복 확인
-        existing_email = next((user for user in users_db if user["email"] == user_data.email), None)
-        if existing_email:
-            logger.warning(f"중복된 이메일: {user_data.email}")
+        # bcrypt 연산은 CPU를 오래 사용하므로 스레드풀에서 수행
+        password_hash = await run_in_threadpool(hash_password, user_data.password)
+        
+        # 해시 계산 중 같은 사용자명/이메일로 먼저 가입한 요청이 있는지 다시 확인
+        duplicate = users.find_duplicate(user_data.username, user_data.email)
+        if duplicate:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
+                detail=duplicate
             )
         
         # 새 사용자 생성
-        new_user_id = max([user["id"] for user in users_db], default=0) + 1
-        new_user = {
-            "id": new_user_id,
-            "username": user_data.username,
-            "email": user_data.email,
-            "password_hash": hash_password(user_data.password)
-        }
-        
-        users_db.append(new_user)
+        new_user = users.add(user_data.username, user_data.email, password_hash)
+        global _users_json_cache
+        _users_json_cache = None
         
-        logger.info(f"회원가입 성공: {user_data.username}")
+        logger.info("회원가입 성공: %s", user_data.username)
         
         # 응답에서 password_hash 제외
-        return UserResponse(
-            id=new_user["id"],
-            username=new_user["username"],
-            email=new_user["email"]
-        )
+        return {"id": new_user["id"], "username": new_user["username"], "email": new_user["email"]}
 
-@app.post("/login", response_model=Token)
+@app.post("/login", responses={200: {"model": Token}})
 async def login(username: str = Form(...), password: str = Form(...)):
     """로그인 엔드포인트"""
     with telemetry.create_span("user_login") as span:
         span.set_attribute("user.username", username)
         
-        logger.info(f"로그인 시도: {username}")
+        logger.info("로그인 시도: %s", username)
         
         # 사용자 찾기
         user = get_user_by_username(username)
         if not user:
-            logger.warning(f"존재하지 않는 사용자: {username}")
+            logger.warning("존재하지 않는 사용자: %s", username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
             )
         
         # 비밀번호 검증
-        if not verify_password(password, user["password_hash"]):
-            logger.warning(f"잘못된 비밀번호: {username}")
+        if not await run_in_threadpool(verify_password, password, user["password_hash"]):
+            logger.warning("잘못된 비밀번호: %s", username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
@@ -278,29 +421,32 @@ async def login(username: str = Form(...), password: str = Form(...)):
         # JWT 토큰 생성
         access_token = create_access_token(data={"sub": user["id"]})
         
-        logger.info(f"로그인 성공: {username}")
+        logger.info("로그인 성공: %s", username)
         
-        return Token(access_token=access_token, token_type="bearer")
+        return {"access_token": access_token, "token_type": "bearer"}
 
-@app.post("/validate", response_model=UserResponse)
+@app.post("/validate", responses={200: {"model": UserResponse}})
 async def validate_user(current_user: dict = Depends(get_current_user)):
     """사용자 토큰 검증 엔드포인트"""
     with telemetry.create_span("user_validate") as span:
         span.set_attribute("user.id", current_user["id"])
         span.set_attribute("user.username", current_user["username"])
         
-        logger.info(f"토큰 검증 성공: {current_user['username']}")
+        logger.info("토큰 검증 성공: %s", current_user['username'])
         
-        return UserResponse(
-            id=current_user["id"],
-            username=current_user["username"],
-            email=current_user["email"]
-        )
+        return {"id": current_user["id"], "username": current_user["username"], "email": current_user["email"]}
 
-@app.get("/metrics")
-async def metrics():
-    """프로메테우스 메트릭 엔드포인트"""
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+# 프로메테우스 메트릭 엔드포인트 (직렬화는 스레드풀에서 수행)
+app.add_api_route("/metrics", get_metrics_endpoint(), methods=["GET"])
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True) 
\ No newline at end of file
+    # 사용자 저장소와 토큰 캐시는 워커별 메모리에 있으므로 기본 워커 수는 1
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8001,
+        reload=os.environ.get("RELOAD") == "1",
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WORKERS", "1"))
+    ) 
\ No newline at end of file